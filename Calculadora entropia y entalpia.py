@@ -8,6 +8,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import math
 import csv
+from functools import lru_cache
+
+try:
+    import numpy as np  # Opcional: solo se usa en los cálculos por lotes
+except ImportError:
+    np = None
 
 # -----------------------
 # Constantes y Parámetros
@@ -20,6 +26,7 @@ S0_REF_KJ_PER_KGK = 7.634   # kJ/(kg·K)
 
 M_ETHANE_G_PER_MOL = 30.069
 M_ETHANE_KG_PER_MOL = M_ETHANE_G_PER_MOL / 1000.0  # kg/mol
+J_PER_MOL_TO_KJ_PER_KG = 1.0 / (M_ETHANE_KG_PER_MOL * 1000.0)  # Factor J/mol -> kJ/kg
 
 H0_REF_J_PER_MOL = H0_REF_KJ_PER_KG * 1000.0 * M_ETHANE_KG_PER_MOL
 S0_REF_J_PER_MOLK = S0_REF_KJ_PER_KGK * 1000.0 * M_ETHANE_KG_PER_MOL
@@ -29,49 +36,178 @@ T_C = 305.3  # K
 P_C = 4.9e6  # Pa
 OMEGA = 0.100
 
+# Coeficientes de las correlaciones de Pitzer para las propiedades residuales
+# H_r: 0.083 - 1.097/Tr^1.6 + ω (0.139 - 0.894/Tr^4.2);  S_r: 0.675/Tr^2.6 + ω 0.722/Tr^5.2
+HR_B0_A, HR_B0_B = 0.083, 1.097
+HR_B1_A, HR_B1_B = 0.139, 0.894
+SR_B0 = 0.675
+SR_B1 = 0.722
+
 # Coeficientes para el cálculo de Cp (ya multiplicados por R para eficiencia)
 # Cp = A + B*T + C*T^2
 CP_A = 1.131 * R
 CP_B = 19.225e-3 * R
 CP_C = -5.561e-6 * R
 
+# Constantes derivadas (precalculadas para no repetirlas en cada llamada)
+CP_B_2 = CP_B / 2
+CP_C_2 = CP_C / 2
+CP_C_3 = CP_C / 3
+T0_REF2 = T0_REF**2
+T0_REF3 = T0_REF**3
+LOG_T0_REF = math.log(T0_REF)
+LOG_P0_REF = math.log(P0_REF)
+
+# Términos de referencia de las integrales analíticas, agrupados en una constante
+H_IG_CONST = H0_REF_J_PER_MOL - CP_A * T0_REF - CP_B_2 * T0_REF2 - CP_C_3 * T0_REF3
+S_IG_CONST = (S0_REF_J_PER_MOLK - CP_A * LOG_T0_REF - CP_B * T0_REF - CP_C_2 * T0_REF2 +
+              R * LOG_P0_REF)
+
+# Etiquetas de la tabla de resultados, en el orden que devuelve _compute_all
+RESULT_LABELS = (
+    "Entalpía Ideal (kJ/kg)",
+    "Entalpía Residual (kJ/kg)",
+    "Entalpía Total (kJ/kg)",
+    "Entropía Ideal (kJ/kg·K)",
+    "Entropía Residual (kJ/kg·K)",
+    "Entropía Total (kJ/kg·K)",
+)
+# Formato de cada línea de la tabla de resultados (fuente monoespaciada)
+RESULT_ROW_FMT = "{:<30}{:>18}"
+# Claves equivalentes para los resultados de compute_all / thermo_properties
+RESULT_KEYS = ("h_ig", "h_r", "h_total", "s_ig", "s_r", "s_total")
+
 # -----------------------
 # Funciones Termodinámicas
 # -----------------------
 def compute_h_ig_molar_analytical(T):
     """Calcula la entalpía ideal molar mediante integración analítica de Cp."""
-    integral = (CP_A * (T - T0_REF) +
-                (CP_B / 2) * (T**2 - T0_REF**2) +
-                (CP_C / 3) * (T**3 - T0_REF**3))
-    return H0_REF_J_PER_MOL + integral
+    return H_IG_CONST + T * (CP_A + T * (CP_B_2 + T * CP_C_3))  # Forma de Horner
 
-def compute_s_ig_molar_analytical(T, P):
-    """Calcula la entropía ideal molar mediante integración analítica de Cp/T."""
+def _check_T(T):
+    """Valida que T sea positiva (precondición de los núcleos sin chequeo)."""
     if T <= 0: raise ValueError("La temperatura (T) debe ser positiva.")
+
+def _check_T_P(T, P):
+    """Valida que T y P sean positivos (precondición única de los núcleos sin chequeo)."""
+    _check_T(T)
     if P <= 0: raise ValueError("La presión (P) debe ser positiva.")
-    
-    integral = (CP_A * math.log(T / T0_REF) +
-                CP_B * (T - T0_REF) +
-                (CP_C / 2) * (T**2 - T0_REF**2))
-    
-    log_term = -R * math.log(P / P0_REF)
-    return S0_REF_J_PER_MOLK + integral + log_term
+
+def _s_ig_unchecked(T, P):
+    """Entropía ideal molar sin validar entradas (requiere T > 0 y P > 0)."""
+    return (S_IG_CONST + CP_A * math.log(T) + T * (CP_B + T * CP_C_2) -
+            R * math.log(P))
+
+def compute_s_ig_molar_analytical(T, P):
+    """Calcula la entropía ideal molar mediante integración analítica de Cp/T."""
+    _check_T_P(T, P)
+    return _s_ig_unchecked(T, P)
+
+def _residuals_unchecked(T, P):
+    """
+    Calcula a la vez la entalpía y la entropía residuales molares (H_r, S_r),
+    sin validar entradas (requiere T > 0).
+    """
+    # Una sola potencia no entera; las demás salen por productos:
+    # Tr^-2.6 = Tr^-1.6 / Tr, Tr^-4.2 = Tr^-1.6 * Tr^-2.6, Tr^-5.2 = (Tr^-2.6)^2
+    Tr = T / T_C
+    inv_tr16 = Tr ** -1.6
+    inv_tr26 = inv_tr16 / Tr
+    inv_tr42 = inv_tr16 * inv_tr26
+    inv_tr52 = inv_tr26 * inv_tr26
+
+    dP = P - P0_REF
+    h_bracket = (HR_B0_A - HR_B0_B * inv_tr16 + OMEGA * (HR_B1_A - HR_B1_B * inv_tr42))
+    s_bracket = (SR_B0 * inv_tr26 + OMEGA * (SR_B1 * inv_tr52))
+    return (R * T_C / P_C) * dP * h_bracket, - (R / P_C) * dP * s_bracket
 
 def h_r_molar(T, P):
     """Calcula la entalpía residual molar."""
-    Tr = T / T_C
-    if Tr <= 0: raise ValueError("La temperatura reducida (Tr) debe ser positiva.")
-    
-    bracket = (0.083 - 1.097 / (Tr**1.6) + OMEGA * (0.139 - 0.894 / (Tr**4.2)))
-    return (R * T_C / P_C) * (P - P0_REF) * bracket
+    _check_T(T)
+    return _residuals_unchecked(T, P)[0]
 
 def s_r_molar(T, P):
     """Calcula la entropía residual molar."""
-    Tr = T / T_C
-    if Tr <= 0: raise ValueError("La temperatura reducida (Tr) debe ser positiva.")
-    
-    bracket = (0.675 / (Tr**2.6) + OMEGA * (0.722 / (Tr**5.2)))
-    return - (R / P_C) * (P - P0_REF) * bracket
+    _check_T(T)
+    return _residuals_unchecked(T, P)[1]
+
+def compute_all(T_arr, P_arr):
+    """
+    Versión vectorizada (NumPy) de todas las propiedades para barridos de T/P.
+    Devuelve un dict con seis arrays en kJ/kg y kJ/(kg·K).
+    """
+    if np is None:
+        raise ImportError("compute_all requiere NumPy (pip install numpy).")
+
+    T = np.asarray(T_arr, dtype=np.float64)
+    P = np.asarray(P_arr, dtype=np.float64)
+    if np.any(T <= 0): raise ValueError("La temperatura (T) debe ser positiva.")
+    if np.any(P <= 0): raise ValueError("La presión (P) debe ser positiva.")
+
+    # Los núcleos sin math.* operan elemento a elemento sobre arrays: se reutilizan tal cual
+    H_ig = compute_h_ig_molar_analytical(T)
+    H_r, S_r = _residuals_unchecked(T, P)
+    # Igual que _s_ig_unchecked, con np.log en lugar de math.log
+    S_ig = S_IG_CONST + CP_A * np.log(T) + T * (CP_B + T * CP_C_2) - R * np.log(P)
+
+    values = (H_ig, H_r, H_ig + H_r, S_ig, S_r, S_ig + S_r)
+    return {key: to_kj_per_kg(val) for key, val in zip(RESULT_KEYS, values)}
+
+# Núcleos compilados con Numba (o sus versiones en Python puro), creados por _get_jit()
+_jitted_kernels = None
+
+def _get_jit():
+    """
+    Devuelve los núcleos (h_ig, s_ig, residuales) compilados con Numba. La importación
+    se hace solo en la primera llamada para no retrasar el arranque de la GUI; si Numba
+    no está instalado o la compilación falla se usan las funciones en Python puro.
+    """
+    global _jitted_kernels
+    if _jitted_kernels is None:
+        kernels = (compute_h_ig_molar_analytical, _s_ig_unchecked, _residuals_unchecked)
+        try:
+            from numba import njit
+            kernels = (
+                njit("float64(float64)", cache=True, fastmath=True)(compute_h_ig_molar_analytical),
+                njit("float64(float64, float64)", cache=True, fastmath=True)(_s_ig_unchecked),
+                njit("UniTuple(float64, 2)(float64, float64)", cache=True, fastmath=True)(_residuals_unchecked),
+            )
+        except Exception:
+            pass  # p. ej. sin caché disponible en un ejecutable congelado: Python puro
+        _jitted_kernels = kernels
+    return _jitted_kernels
+
+@lru_cache(maxsize=256)
+def _compute_all(T, P):
+    """Calcula las seis propiedades en kJ/kg (memoizado por (T, P); T y P ya validados)."""
+    h_ig, s_ig, residuals = _get_jit()
+    H_ig_molar = h_ig(T)
+    S_ig_molar = s_ig(T, P)
+    H_r_val, s_r_val = residuals(T, P)
+
+    H_total_molar = H_ig_molar + H_r_val
+    s_total_molar = S_ig_molar + s_r_val
+
+    k = J_PER_MOL_TO_KJ_PER_KG
+    return (
+        H_ig_molar * k,
+        H_r_val * k,
+        H_total_molar * k,
+        S_ig_molar * k,
+        s_r_val * k,
+        s_total_molar * k,
+    )
+
+def thermo_properties(T, P):
+    """
+    Punto de entrada único: usa la versión vectorizada si T o P son arrays de NumPy
+    y el núcleo escalar (memoizado) en caso contrario. Devuelve un dict por RESULT_KEYS.
+    """
+    if np is not None and (isinstance(T, np.ndarray) or isinstance(P, np.ndarray)):
+        return compute_all(T, P)
+    T, P = float(T), float(P)
+    _check_T_P(T, P)
+    return dict(zip(RESULT_KEYS, _compute_all(T, P)))
 
 # -----------------------
 # Utilidades
@@ -80,17 +216,17 @@ def parse_pressure_input(s):
     """Parsea la entrada de presión, permitiendo Pa, bar o atm."""
     s = s.strip().lower()
     try:
-        if "bar" in s:
-            return float(s.replace("bar", "").strip()) * 1e5
-        if "atm" in s:
-            return float(s.replace("atm", "").strip()) * 101325.0
+        if s.endswith("bar"):
+            return float(s[:-3]) * 1e5
+        if s.endswith("atm"):
+            return float(s[:-3]) * 101325.0
         return float(s)  # Asume Pa por defecto
     except (ValueError, TypeError):
         raise ValueError("Formato de presión inválido. Use '2e5', '2 bar' o '1.5 atm'.")
 
 def to_kj_per_kg(j_per_mol):
     """Convierte de J/mol a kJ/kg."""
-    return (j_per_mol / M_ETHANE_KG_PER_MOL) / 1000.0
+    return j_per_mol * J_PER_MOL_TO_KJ_PER_KG
 
 # -----------------------
 # Clase Principal de la GUI
@@ -104,8 +240,10 @@ class EntropyEnthalpyApp(tk.Tk):
 
         self.last_results_raw = []
         self.last_T_P = (None, None)
+        self._selected_row = None  # Índice en last_results_raw de la fila del menú contextual
 
         self._create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def _create_widgets(self):
         """Crea y organiza todos los widgets de la interfaz."""
@@ -148,14 +286,12 @@ class EntropyEnthalpyApp(tk.Tk):
         ttk.Label(info_frame, text="Presión (Pa):").pack(side="left", padx=(10, 2), pady=5)
         ttk.Label(info_frame, textvariable=self.P_var, font=("Arial", 10, "bold")).pack(side="left")
 
-        # --- Tabla de Resultados ---
-        columns = ("propiedad", "valor")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=10)
-        self.tree.heading("propiedad", text="Propiedad")
-        self.tree.heading("valor", text="Valor")
-        self.tree.column("propiedad", width=300, anchor="w")
-        self.tree.column("valor", width=180, anchor="e")
-        self.tree.pack(side="top", fill="both", expand=True, padx=10, pady=(5, 10))
+        # --- Tabla de Resultados (texto de ancho fijo: una línea por propiedad) ---
+        self.results = tk.Text(self, height=8, width=60, font=("Courier", 10), state="disabled")
+        self.results.tag_configure("header", font=("Courier", 10, "bold"))
+        self.results.tag_configure("selected", background="#cce4ff")
+        self.results.pack(side="top", fill="both", expand=True, padx=10, pady=(5, 10))
+        self._render_results([RESULT_ROW_FMT.format(prop, "---") for prop in RESULT_LABELS])
 
         # --- Barra de Estado ---
         self.status = ttk.Label(self, text="Listo", relief="sunken", anchor="w", padding=2)
@@ -165,13 +301,19 @@ class EntropyEnthalpyApp(tk.Tk):
         self.context_menu = tk.Menu(self, tearoff=0)
         self.context_menu.add_command(label="Copiar Valor (Máxima Precisión)", command=self.copy_selected_value)
         self.context_menu.add_command(label="Copiar Fila", command=self.copy_selected_row)
-        self.tree.bind("<Button-3>", self.show_context_menu)
-
-    def on_calculate(self):
-        """Valida entradas, ejecuta los cálculos y actualiza la GUI."""
+        self.results.bind("<Button-3>", self.show_context_menu)
+        self.context_menu.bind("<Unmap>", self._clear_highlight)  # Menú cerrado sin elegir opción
+
+    def on_calculate(self, _parse=parse_pressure_input, _check=_check_T_P,
+                     _compute=_compute_all, _labels=RESULT_LABELS):
+        """
+        Valida entradas, ejecuta los cálculos y actualiza la GUI.
+        Los argumentos por defecto enlazan las funciones globales como locales (LOAD_FAST).
+        """
         try:
             T = float(self.entry_T.get().strip())
-            P = parse_pressure_input(self.entry_P.get().strip())
+            P = _parse(self.entry_P.get().strip())
+            _check(T, P)
 
             if not (298.0 <= T <= 1500.0):
                 msg = f"La temperatura T = {T:.1f} K está fuera del rango de validez (298-1500 K).\n¿Desea continuar de todos modos?"
@@ -179,23 +321,13 @@ class EntropyEnthalpyApp(tk.Tk):
                     return
             
             # --- Lógica de Cálculo ---
-            H_ig_molar = compute_h_ig_molar_analytical(T)
-            S_ig_molar = compute_s_ig_molar_analytical(T, P)
-            H_r_val = h_r_molar(T, P)
-            s_r_val = s_r_molar(T, P)
-            
-            H_total_molar = H_ig_molar + H_r_val
-            s_total_molar = S_ig_molar + s_r_val
+            if _jitted_kernels is None:  # La primera llamada compila los núcleos
+                self.status.config(text="Compilando núcleos numéricos…")
+                self.update_idletasks()
+            values = _compute(T, P)
 
             # Guardar resultados con máxima precisión
-            self.last_results_raw = [
-                ("Entalpía Ideal (kJ/kg)", to_kj_per_kg(H_ig_molar)),
-                ("Entalpía Residual (kJ/kg)", to_kj_per_kg(H_r_val)),
-                ("Entalpía Total (kJ/kg)", to_kj_per_kg(H_total_molar)),
-                ("Entropía Ideal (kJ/kg·K)", to_kj_per_kg(S_ig_molar)),
-                ("Entropía Residual (kJ/kg·K)", to_kj_per_kg(s_r_val)),
-                ("Entropía Total (kJ/kg·K)", to_kj_per_kg(s_total_molar)),
-            ]
+            self.last_results_raw = list(zip(_labels, values))
             self.last_T_P = (T, P)
 
             # --- Actualización de la GUI ---
@@ -207,25 +339,30 @@ class EntropyEnthalpyApp(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error Inesperado", f"Ocurrió un error durante el cálculo:\n{e}")
 
+    def _render_results(self, lines):
+        """Reescribe el bloque de resultados (encabezado + una línea por propiedad)."""
+        header = RESULT_ROW_FMT.format("Propiedad", "Valor") + "\n"
+        self.results.config(state="normal")
+        self.results.delete("1.0", "end")
+        self.results.insert("end", header, "header")
+        self.results.insert("end", "\n".join(lines))
+        self.results.config(state="disabled")
+
     def update_display(self):
         """Actualiza la tabla y los labels con los últimos resultados calculados."""
-        # Limpiar tabla
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
         # Formatear y mostrar resultados
-        rows_display = [(prop, f"{valor:.5f}") for prop, valor in self.last_results_raw]
-        for r in rows_display:
-            self.tree.insert("", "end", values=r)
-        
+        fmt = "{:.5f}".format
+        self._render_results([RESULT_ROW_FMT.format(prop, fmt(valor)) for prop, valor in self.last_results_raw])
+        self._selected_row = None
+
         T, P = self.last_T_P
         self.T_var.set(f"{T:.2f}")
         self.P_var.set(f"{P:.2e}")
 
     def on_clear(self):
         """Limpia la tabla de resultados, los labels y los datos almacenados."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        self._render_results([RESULT_ROW_FMT.format(prop, "---") for prop in RESULT_LABELS])
+        self._selected_row = None
         self.status.config(text="Tabla limpiada.")
         self.last_results_raw = []
         self.last_T_P = (None, None)
@@ -245,49 +382,62 @@ class EntropyEnthalpyApp(tk.Tk):
         if not path: return
 
         T_val, P_val_pa = self.last_T_P
-        with open(path, "w", newline="", encoding="utf-8") as f:
+        T_str, P_str = f"{T_val:.4f}", f"{P_val_pa:.4e}"
+        fmt8 = "{:.8f}".format
+        rows = [[propiedad, fmt8(valor), T_str, P_str] for propiedad, valor in self.last_results_raw]
+        with open(path, "w", newline="", encoding="utf-8", buffering=1 << 16) as f:
             writer = csv.writer(f)
             writer.writerow(["Propiedad", "Valor", "Temperatura (K)", "Presión (Pa)"])
-            for propiedad, valor in self.last_results_raw:
-                writer.writerow([propiedad, f"{valor:.8f}", f"{T_val:.4f}", f"{P_val_pa:.4e}"])
+            writer.writerows(rows)
         messagebox.showinfo("Guardar CSV", f"Resultados guardados en:\n{path}")
 
+    def on_close(self):
+        """Procesa los eventos pendientes (p. ej. el portapapeles) y cierra la ventana."""
+        self.update()
+        self.destroy()
+
     def show_context_menu(self, event):
         """Muestra el menú contextual al hacer clic derecho en la tabla."""
-        if self.tree.identify_row(event.y):
-            self.tree.focus(self.tree.identify_row(event.y)) # Selecciona la fila
+        line = int(self.results.index(f"@{event.x},{event.y}").split(".")[0])
+        # index() se ajusta a la línea más cercana: descartar clics fuera de ella
+        info = self.results.dlineinfo(f"{line}.0")
+        if not info or not (info[1] <= event.y < info[1] + info[3]): return
+
+        row = line - 2  # La línea 1 es el encabezado
+        if 0 <= row < len(self.last_results_raw):
+            self._selected_row = row  # Selecciona la fila
+            self._clear_highlight()
+            self.results.tag_add("selected", f"{line}.0", f"{line}.end")
             self.context_menu.post(event.x_root, event.y_root)
 
+    def _clear_highlight(self, event=None):
+        """Quita el resaltado de la fila elegida con el menú contextual."""
+        self.results.tag_remove("selected", "1.0", "end")
+
     def _copy_to_clipboard(self, content):
         """Helper para copiar contenido al portapapeles."""
         self.clipboard_clear()
         self.clipboard_append(str(content))
-        self.update()
+        self.update_idletasks()
 
     def copy_selected_value(self):
         """Copia el valor numérico con máxima precisión de la fila seleccionada."""
-        selected_item = self.tree.focus()
-        if not selected_item: return
-        
-        prop_name = self.tree.item(selected_item, 'values')[0]
-        for prop, val in self.last_results_raw:
-            if prop == prop_name:
-                self._copy_to_clipboard(val)
-                self.status.config(text=f"Valor '{val}' copiado al portapapeles.")
-                break
+        if self._selected_row is None: return
+
+        val = self.last_results_raw[self._selected_row][1]
+        self._copy_to_clipboard(val)
+        self._clear_highlight()
+        self.status.config(text=f"Valor '{val}' copiado al portapapeles.")
 
     def copy_selected_row(self):
         """Copia la propiedad y su valor (máxima precisión) de la fila seleccionada."""
-        selected_item = self.tree.focus()
-        if not selected_item: return
-
-        prop_name = self.tree.item(selected_item, 'values')[0]
-        for prop, val in self.last_results_raw:
-            if prop == prop_name:
-                row_data = f"{prop}\t{val}"  # Separado por tabulador
-                self._copy_to_clipboard(row_data)
-                self.status.config(text=f"Fila '{prop}' copiada al portapapeles.")
-                break
+        if self._selected_row is None: return
+
+        prop, val = self.last_results_raw[self._selected_row]
+        row_data = f"{prop}\t{val}"  # Separado por tabulador
+        self._copy_to_clipboard(row_data)
+        self._clear_highlight()
+        self.status.config(text=f"Fila '{prop}' copiada al portapapeles.")
 
 # -----------------------
 # Punto de Entrada Principal